@@ -14,6 +14,7 @@ from .alert_communicator import AlertCommunicator
 from .camera_pipeline import CameraPipeline
 from .proctor_pipeline import ProctorPipeline
 from .shared_frame_buffer import SharedFrameBuffer
+from .motion_gate import MotionGate
 
 __all__ = [
     'CameraCapture',
@@ -27,5 +28,6 @@ __all__ = [
     'AlertCommunicator',
     'CameraPipeline',
     'ProctorPipeline',
-    'SharedFrameBuffer'
+    'SharedFrameBuffer',
+    'MotionGate'
 ]
@@ -5,11 +5,23 @@ Handles camera capture and frame retrieval
 
 import cv2
 import logging
+import sys
+import threading
+import time
 
 
 class CameraCapture:
     """Handles camera input and frame capture"""
     
+    # Consecutive failed grabs tolerated before the grabber thread gives up,
+    # with the retry delay doubling from GRAB_RETRY_DELAY up to GRAB_RETRY_MAX_DELAY
+    MAX_GRAB_RETRIES = 10
+    GRAB_RETRY_DELAY = 0.01
+    GRAB_RETRY_MAX_DELAY = 0.5
+    
+    # Minimum seconds between grabber restarts / "not running" warnings
+    RESTART_INTERVAL = 1.0
+    
     def __init__(self, camera_id=0, width=None, height=None, fps=None):
         """
         Initialize camera capture
@@ -27,16 +39,42 @@ class CameraCapture:
         self.fps = fps
         self.is_opened = False
         
+        # Cached once so per-frame debug logging costs a single boolean check
+        self._log_debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        
+        # Background grabber state: the thread writes into the inactive slot
+        # and flips the index, so readers never need to copy the frame
+        self._slots = [None, None]
+        self._active = 0
+        self._thread = None
+        self.stop_thread = False
+        self.is_grabbing = False
+        
+        # Grabber is paced to the camera frame period and signals each new frame
+        self._new_frame = threading.Event()
+        self._frame_period = 1.0 / self.fps if self.fps else 1.0 / 30
+        
+        # Incremented for every published frame; read_frame() only returns
+        # a frame whose sequence number it has not returned before
+        self._frame_seq = 0
+        self._last_read_seq = 0
+        
+        # Last time read_frame() tried to restart a stopped grabber thread
+        self._last_restart = 0.0
+        
         logging.info(f"Initializing camera with ID: {camera_id}")
         
     def start(self):
         """Start camera capture"""
         try:
-            self.capture = cv2.VideoCapture(self.camera_id)
+            self.capture = self._open_capture()
             
             if not self.capture.isOpened():
                 raise RuntimeError(f"Failed to open camera {self.camera_id}")
             
+            # Keep only the freshest frame in the driver queue (lower latency)
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             # Set camera properties if specified
             if self.width:
                 self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
@@ -52,37 +90,168 @@ class CameraCapture:
             actual_width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
             actual_height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
             actual_fps = int(self.capture.get(cv2.CAP_PROP_FPS))
+            actual_buffer = int(self.capture.get(cv2.CAP_PROP_BUFFERSIZE))
             logging.info(f"Camera resolution: {actual_width}x{actual_height} @ {actual_fps}fps")
+            logging.info(f"Camera buffer size: {actual_buffer}")
+            
+            # Pace to the negotiated rate; a camera slower than requested would
+            # otherwise make read_frame() time out and return the same frame
+            negotiated_fps = self.capture.get(cv2.CAP_PROP_FPS)
+            if negotiated_fps > 0:
+                self._frame_period = 1.0 / negotiated_fps
+            
+            # Prime the active slot so the first read_frame() has data
+            grabbed, frame = self.capture.read()
+            if grabbed:
+                self._slots[self._active] = frame
+                self._frame_seq += 1
+            
+            self._start_grabber()
             
             return True
             
         except Exception as e:
-            logging.error(f"Error starting camera: {e}")
+            logging.error("Error starting camera: %s", e)
             return False
     
+    def _open_capture(self):
+        """
+        Open the capture device, preferring V4L2 on Linux
+        
+        The default backend often ignores CAP_PROP_BUFFERSIZE, so on Linux
+        V4L2 is tried first and the default backend is used as a fallback.
+        
+        Returns:
+            cv2.VideoCapture: Capture object (may not be opened)
+        """
+        if sys.platform.startswith('linux'):
+            capture = cv2.VideoCapture(self.camera_id, cv2.CAP_V4L2)
+            if capture.isOpened():
+                return capture
+            capture.release()
+        
+        return cv2.VideoCapture(self.camera_id)
+    
+    def _start_grabber(self):
+        """Start the background grabber thread"""
+        self.stop_thread = False
+        self.is_grabbing = True
+        self._thread = threading.Thread(target=self._update, name="CameraCapture", daemon=True)
+        self._thread.start()
+    
+    def _update(self):
+        """
+        Background loop that keeps the latest camera frame available
+        
+        grab() is the blocking sync point and runs inside OpenCV with the GIL
+        released; retrieve() only decodes. Locals keep per-frame bytecode minimal.
+        """
+        capture = self.capture
+        slots = self._slots
+        new_frame = self._new_frame
+        frame_period = self._frame_period
+        next_tick = time.monotonic()
+        failures = 0
+        
+        try:
+            while not self.stop_thread:
+                if not capture.grab():
+                    # Ride out transient driver hiccups with exponential backoff
+                    failures += 1
+                    if failures == 1:
+                        # Drop the last good frame so readers see the outage
+                        slots[0] = slots[1] = None
+                    if failures > self.MAX_GRAB_RETRIES:
+                        logging.warning("Camera grab failed %d times, stopping capture thread", failures)
+                        break
+                    time.sleep(min(self.GRAB_RETRY_DELAY * (2 ** (failures - 1)), self.GRAB_RETRY_MAX_DELAY))
+                    next_tick = time.monotonic()
+                    continue
+                failures = 0
+                
+                retrieved, frame = capture.retrieve()
+                if retrieved:
+                    # Publish into the inactive slot, then flip (int store is atomic under the GIL)
+                    inactive = 1 - self._active
+                    slots[inactive] = frame
+                    self._active = inactive
+                    self._frame_seq += 1
+                    new_frame.set()
+                
+                # Sleep until the next frame is due instead of spinning on grab()
+                next_tick += frame_period
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.monotonic()
+        finally:
+            self.is_grabbing = False
+    
     def read_frame(self):
         """
-        Read a frame from the camera
+        Read the latest frame from the camera
+        
+        Waits up to two frame periods for a frame newer than the last read.
+        If none arrives the read fails rather than returning the same frame
+        again, so a stalled camera is reported instead of frozen. On failure
+        the call always takes at least one frame period so callers retrying
+        in a loop do not spin.
+        
+        The returned frame is shared with the grabber thread and is never
+        written to again, so callers that draw on it should copy first.
         
         Returns:
             tuple: (success, frame) where success is a boolean and frame is the image
         """
         if not self.is_opened or self.capture is None:
-            logging.warning("Camera is not opened")
+            if self._log_debug:
+                logging.debug("Camera is not opened")
+            time.sleep(self._frame_period)
+            return False, None
+        
+        if not self.is_grabbing:
+            # Rate-limited restart of a grabber that gave up after repeated failures
+            now = time.monotonic()
+            if now - self._last_restart >= self.RESTART_INTERVAL:
+                self._last_restart = now
+                logging.warning("Camera capture thread is not running, restarting it")
+                self._start_grabber()
+            time.sleep(self._frame_period)
+            return False, None
+        
+        # Only block when the newest published frame was already returned
+        if self._frame_seq == self._last_read_seq:
+            self._new_frame.wait(timeout=2 * self._frame_period)
+        self._new_frame.clear()
+        
+        seq = self._frame_seq
+        if seq == self._last_read_seq:
+            if self._log_debug:
+                logging.debug("No new camera frame within %.3fs", 2 * self._frame_period)
             return False, None
         
-        success, frame = self.capture.read()
+        frame = self._slots[self._active]
+        self._last_read_seq = seq
         
-        if not success:
+        if frame is None:
             logging.warning("Failed to read frame from camera")
+            time.sleep(self._frame_period)
+            return False, None
         
-        return success, frame
+        return True, frame
     
     def stop(self):
         """Stop camera capture and release resources"""
         print("[DEBUG] === ENTERING Camera.stop() ===")
         try:
-            print("[DEBUG] Camera Step 0: Checking capture object")
+            print("[DEBUG] Camera Step 0: Stopping grabber thread")
+            self.stop_thread = True
+            if self._thread is not None:
+                self._thread.join(timeout=1.0)
+                self._thread = None
+            
+            print("[DEBUG] Camera Step 0.5: Checking capture object")
             if self.capture is not None:
                 print("[DEBUG] Camera Step 1: Calling capture.release()")
                 self.capture.release()
@@ -92,7 +261,7 @@ class CameraCapture:
                 print("[DEBUG] Camera Step 3: Cleanup complete")
         except Exception as e:
             print(f"[DEBUG] ERROR in Camera.stop(): {e}")
-            logging.error(f"Error stopping camera: {e}")
+            logging.error("Error stopping camera: %s", e)
             self.is_opened = False
         print("[DEBUG] === EXITING Camera.stop() ===")
     
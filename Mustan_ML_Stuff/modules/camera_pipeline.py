@@ -81,11 +81,19 @@ class CameraPipeline:
             logging.error("Failed to start camera")
             return False
         
+        # Enable OpenCV T-API (OpenCL) only if requested and a device is present
+        use_opencl = getattr(self.config, 'USE_OPENCL', False)
+        if use_opencl and not cv2.ocl.haveOpenCL():
+            logging.warning("OpenCL requested but not available, using CPU path")
+            use_opencl = False
+        cv2.ocl.setUseOpenCL(use_opencl)
+        
         # Initialize display only if DISPLAY_FEED is enabled
         if getattr(self.config, 'DISPLAY_FEED', True):
             self.display = DisplayWindow(
                 window_name=self.config.WINDOW_NAME,
-                fullscreen=self.config.FULLSCREEN
+                fullscreen=self.config.FULLSCREEN,
+                use_opencl=use_opencl
             )
             
             if not self.display.create_window():
@@ -126,6 +134,7 @@ class CameraPipeline:
         frame_count = 0
         start_time = time.time()
         frame_time = 1.0 / self.config.MAX_FPS if self.config.MAX_FPS > 0 else 0
+        read_failures = 0
         
         try:
             while self.is_running:
@@ -135,8 +144,12 @@ class CameraPipeline:
                 success, frame = self.camera.read_frame()
                 
                 if not success:
-                    logging.warning("Failed to read frame, continuing...")
+                    # read_frame() already paces failures; warn once per failure streak
+                    if read_failures == 0:
+                        logging.warning("Failed to read frame, continuing...")
+                    read_failures += 1
                     continue
+                read_failures = 0
                 
                 # Process frame (can be overridden)
                 processed_frame = self.process_frame(frame)
@@ -25,17 +25,27 @@ class ProctorConfig:
     
     # Performance Settings
     MAX_FPS = 60  # Maximum FPS to process
+    USE_OPENCL = False  # Use OpenCV T-API (cv2.UMat) for display overlays and face detector preprocessing
     FRAME_SKIP = 2  # Process every 3rd frame (0 = process all, 1 = every 2nd, 2 = every 3rd)
+    MOTION_GATE_ENABLE = True  # Reuse last face verification while the scene is static
+    MOTION_GATE_THRESHOLD = 2.0  # Mean abs gray-level difference (80x60 thumbnail) that counts as motion
+    MOTION_GATE_MAX_INTERVAL = 2.0  # Re-verify at least this often (seconds) even without motion
     
     # Shared Memory Settings (for frontend frame streaming)
     SHARED_MEMORY_ENABLED = True  # Enable shared memory buffer for zero-copy frame sharing
     SHARED_MEMORY_PATH = "shared_memory/proctor_frame.mmap"  # Relative to project root
+    SHARED_MEMORY_USE_SHM = True  # Linux: place the buffer in /dev/shm (no disk I/O); ignored where unavailable
+    SHARED_MEMORY_FRAME_FORMAT = "jpeg"  # "jpeg" (Electron preview) or "raw" (BGR bytes, no encode cost)
     
     # Face Detection Settings (MediaPipe)
     FACE_DETECT_ENABLE = True
     FACE_MODEL_SELECTION = 1  # 0 for short-range (<2m), 1 for full-range (<5m)
     FACE_MIN_DETECTION_CONFIDENCE = 0.7  # Minimum confidence for face detection
     FACE_MIN_TRACKING_CONFIDENCE = 0.5  # Minimum confidence for face tracking
+    # Downscale width for face landmarker input (0 = full resolution). The iris landmarks from
+    # this pass drive the eye-gaze ratios, so going below 640 makes the eyes only ~10-15 px wide
+    # on 720p/1080p cameras and adds gaze-alert noise; re-check EYE_* thresholds before lowering
+    FACE_DETECT_INPUT_WIDTH = 640
     
     # Face Mesh Visualization Settings
     SHOW_ALL_FACE_LANDMARKS = True  # Show all 478 face mesh points (set False for key points only)
@@ -73,6 +83,9 @@ class ProctorConfig:
     FACE_MATCHING_BACKEND = "Facenet"  # DeepFace backend: VGG-Face, Facenet, Facenet512, OpenFace, DeepFace, ArcFace, Dlib, SFace
     FACE_MATCHING_DISTANCE_METRIC = "cosine"  # Distance metric: cosine, euclidean, euclidean_l2
     FACE_MATCHING_THRESHOLD = 0.5  # Distance threshold (model-specific, lower = stricter)
+    FACE_MATCHING_QUANTIZE = True  # Compare int8-quantized embeddings (cosine metric only)
+    FACE_MATCHING_BATCH_SIZE = 4  # Face crops embedded per DeepFace forward pass (1 = match every crop immediately)
+    FACE_MATCHING_BATCH_TIMEOUT = 0.1  # Max seconds a queued crop waits before a partial batch runs
     # Recommended thresholds (cosine): VGG-Face=0.40, Facenet=0.40, Facenet512=0.30, ArcFace=0.68, Dlib=0.07, SFace=0.593, OpenFace=0.10
     
     # Phone Detection Settings
@@ -10,16 +10,18 @@ import logging
 class DisplayWindow:
     """Handles display window and frame rendering"""
     
-    def __init__(self, window_name="Camera Pipeline", fullscreen=False):
+    def __init__(self, window_name="Camera Pipeline", fullscreen=False, use_opencl=False):
         """
         Initialize display window
         
         Args:
             window_name: Name of the display window
             fullscreen: Whether to display in fullscreen mode
+            use_opencl: Draw overlays on a cv2.UMat (OpenCL) instead of a CPU copy
         """
         self.window_name = window_name
         self.fullscreen = fullscreen
+        self.use_opencl = use_opencl
         self.is_initialized = False
         
         logging.info(f"Initializing display window: {window_name}")
@@ -65,7 +67,7 @@ class DisplayWindow:
         
         # Add FPS text if provided
         if fps is not None:
-            display_frame = frame.copy()
+            display_frame = self._overlay_frame(frame)
             cv2.putText(
                 display_frame,
                 f"FPS: {fps:.1f}",
@@ -85,6 +87,24 @@ class DisplayWindow:
             logging.error(f"Error displaying frame: {e}")
             return False
     
+    def _overlay_frame(self, frame):
+        """
+        Get a drawable copy of the frame, on the GPU when OpenCL is enabled
+        
+        Args:
+            frame: Source frame (left untouched)
+            
+        Returns:
+            cv2.UMat or numpy array: Frame to draw on
+        """
+        if self.use_opencl:
+            try:
+                return cv2.UMat(frame)
+            except cv2.error as e:
+                logging.warning(f"UMat unavailable, falling back to CPU copy: {e}")
+                self.use_opencl = False
+        return frame.copy()
+    
     def check_exit_key(self, wait_time=1):
         """
         Check for exit key press (ESC or 'q')
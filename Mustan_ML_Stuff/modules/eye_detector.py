@@ -12,12 +12,103 @@ from datetime import datetime
 from pathlib import Path
 from .base_detector import BaseDetector
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.warning("Numba not available, eye metrics run in pure Python. Install with: pip install numba")
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        def decorator(func):
+            return func
+        return decorator
+
 # MediaPipe eye and iris landmark indices (478-point face mesh)
 # These indices match the FaceDetector's MediaPipe Face Mesh output
 LEFT_EYE = [33, 133, 160, 159, 158, 144, 145, 153]
 RIGHT_EYE = [362, 263, 387, 386, 385, 380, 374, 373]
 LEFT_IRIS = [468, 469, 470, 471, 472]
 RIGHT_IRIS = [473, 474, 475, 476, 477]
+NUM_LANDMARKS = 478  # 468 face mesh points + 10 iris points
+
+# Only these 26 landmarks are gathered per frame, in this order
+EYE_LANDMARKS = LEFT_EYE + LEFT_IRIS + RIGHT_EYE + RIGHT_IRIS
+
+# Index arrays for the compiled kernel, remapped to positions in EYE_LANDMARKS
+_left_iris_start = len(LEFT_EYE)
+_right_eye_start = _left_iris_start + len(LEFT_IRIS)
+_right_iris_start = _right_eye_start + len(RIGHT_EYE)
+LEFT_EYE_IDX = np.arange(0, _left_iris_start, dtype=np.int64)
+LEFT_IRIS_IDX = np.arange(_left_iris_start, _right_eye_start, dtype=np.int64)
+RIGHT_EYE_IDX = np.arange(_right_eye_start, _right_iris_start, dtype=np.int64)
+RIGHT_IRIS_IDX = np.arange(_right_iris_start, len(EYE_LANDMARKS), dtype=np.int64)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def compute_ear_and_gaze(landmarks_xy, eye_idx, iris_idx):
+    """
+    Compute eye geometry, Eye Aspect Ratio and gaze ratios for one eye
+    
+    Args:
+        landmarks_xy: Array of landmark pixel coordinates, shape (N, 2)
+        eye_idx: Eye contour landmark indices (first six ordered for EAR)
+        iris_idx: Iris landmark indices
+        
+    Returns:
+        tuple: (ear, horizontal_ratio, vertical_ratio, eye_cx, eye_cy,
+                iris_cx, iris_cy, eye_left, eye_top, eye_right, eye_bottom)
+    """
+    n = eye_idx.shape[0]
+    sum_x = 0.0
+    sum_y = 0.0
+    eye_left = landmarks_xy[eye_idx[0], 0]
+    eye_right = eye_left
+    eye_top = landmarks_xy[eye_idx[0], 1]
+    eye_bottom = eye_top
+    for i in range(n):
+        x = landmarks_xy[eye_idx[i], 0]
+        y = landmarks_xy[eye_idx[i], 1]
+        sum_x += x
+        sum_y += y
+        eye_left = min(eye_left, x)
+        eye_right = max(eye_right, x)
+        eye_top = min(eye_top, y)
+        eye_bottom = max(eye_bottom, y)
+    eye_cx = int(sum_x / n)
+    eye_cy = int(sum_y / n)
+    
+    # Eye Aspect Ratio: vertical distances over horizontal distance
+    p0 = landmarks_xy[eye_idx[0]]
+    p1 = landmarks_xy[eye_idx[1]]
+    p2 = landmarks_xy[eye_idx[2]]
+    p3 = landmarks_xy[eye_idx[3]]
+    p4 = landmarks_xy[eye_idx[4]]
+    p5 = landmarks_xy[eye_idx[5]]
+    v1 = np.sqrt((p1[0] - p5[0]) ** 2 + (p1[1] - p5[1]) ** 2)
+    v2 = np.sqrt((p2[0] - p4[0]) ** 2 + (p2[1] - p4[1]) ** 2)
+    h = np.sqrt((p0[0] - p3[0]) ** 2 + (p0[1] - p3[1]) ** 2)
+    ear = (v1 + v2) / (2.0 * h + 1e-6)
+    
+    # Iris center
+    m = iris_idx.shape[0]
+    sum_x = 0.0
+    sum_y = 0.0
+    for i in range(m):
+        sum_x += landmarks_xy[iris_idx[i], 0]
+        sum_y += landmarks_xy[iris_idx[i], 1]
+    iris_cx = int(sum_x / m)
+    iris_cy = int(sum_y / m)
+    
+    # Iris offset normalized by eye dimensions
+    eye_width = eye_right - eye_left
+    eye_height = eye_bottom - eye_top
+    horizontal_ratio = (iris_cx - eye_cx) / (eye_width / 2 + 1e-6)
+    vertical_ratio = (iris_cy - eye_cy) / (eye_height / 2 + 1e-6)
+    
+    return (ear, horizontal_ratio, vertical_ratio, eye_cx, eye_cy,
+            iris_cx, iris_cy, eye_left, eye_top, eye_right, eye_bottom)
 
 
 class EyeMovementDetector(BaseDetector):
@@ -84,6 +175,9 @@ class EyeMovementDetector(BaseDetector):
             'iris_points': (255, 0, 255)  # Magenta
         }
         
+        # Reusable buffer of eye/iris landmark (x, y) filled in place every frame
+        self._lm = np.empty((len(EYE_LANDMARKS), 2), dtype=np.float32)
+        
         # Eye movement logging
         self.eye_movement_logger = None
         self.eye_log_file = None
@@ -99,6 +193,13 @@ class EyeMovementDetector(BaseDetector):
         Returns:
             bool: True (always successful)
         """
+        # Compile the Numba kernel now rather than on the first frame with a face
+        if NUMBA_AVAILABLE:
+            try:
+                compute_ear_and_gaze(np.zeros_like(self._lm), LEFT_EYE_IDX, LEFT_IRIS_IDX)
+            except Exception as e:
+                self.logger.warning(f"Eye metrics kernel warm-up failed: {e}")
+        
         self.initialized = True
         self.logger.info("Eye Movement Detector initialized (uses shared FaceDetector face mesh)")
         return True
@@ -159,44 +260,17 @@ class EyeMovementDetector(BaseDetector):
         self.is_calibrated = False
         self.calibration_offsets = {}
     
-    def _get_eye_aspect_ratio(self, eye_landmarks):
-        """
-        Calculate Eye Aspect Ratio (EAR) for blink detection
-        
-        Args:
-            eye_landmarks: Array of eye landmark coordinates
-            
-        Returns:
-            float: Eye aspect ratio
-        """
-        # Vertical distances
-        v1 = np.linalg.norm(eye_landmarks[1] - eye_landmarks[5])
-        v2 = np.linalg.norm(eye_landmarks[2] - eye_landmarks[4])
-        
-        # Horizontal distance
-        h = np.linalg.norm(eye_landmarks[0] - eye_landmarks[3])
-        
-        # EAR formula
-        ear = (v1 + v2) / (2.0 * h + 1e-6)
-        return ear
-    
-    def _get_gaze_direction(self, eye_center, iris_center, eye_width, eye_height):
+    def _get_gaze_direction(self, horizontal_ratio, vertical_ratio):
         """
         Determine gaze direction based on iris position relative to eye center
         
         Args:
-            eye_center: Eye center coordinates (x, y)
-            iris_center: Iris center coordinates (x, y)
-            eye_width: Eye width in pixels
-            eye_height: Eye height in pixels
+            horizontal_ratio: Horizontal iris offset normalized by eye width
+            vertical_ratio: Vertical iris offset normalized by eye height
             
         Returns:
             tuple: (direction_status, is_risky, horizontal_ratio, vertical_ratio)
         """
-        # Normalize by eye dimensions
-        horizontal_ratio = (iris_center[0] - eye_center[0]) / (eye_width / 2 + 1e-6)
-        vertical_ratio = (iris_center[1] - eye_center[1]) / (eye_height / 2 + 1e-6)
-        
         # Determine direction with priority to vertical
         if vertical_ratio > self.vertical_down_threshold:
             return "LOOKING DOWN", True, horizontal_ratio, vertical_ratio
@@ -209,68 +283,47 @@ class EyeMovementDetector(BaseDetector):
         else:
             return "CENTER", False, horizontal_ratio, vertical_ratio
     
-    def _process_eye(self, landmarks, eye_indices, iris_indices, img_w, img_h, eye_name):
+    def _process_eye(self, landmarks_xy, eye_indices, iris_indices, eye_name):
         """
-        Process eye landmarks to extract eye center, iris center, and dimensions
+        Process eye landmarks to extract eye center, iris position, dimensions and gaze ratios
         
         Args:
-            landmarks: List of landmark dicts from FaceDetector with format {'x': int, 'y': int, 'z': float}
-            eye_indices: List of landmark indices for eye contour
-            iris_indices: List of landmark indices for iris
-            img_w: Image width
-            img_h: Image height
+            landmarks_xy: Array of landmark pixel coordinates, shape (N, 2)
+            eye_indices: Index array of landmarks for eye contour
+            iris_indices: Index array of landmarks for iris
             eye_name: Name of the eye (Left/Right)
             
         Returns:
-            dict: Eye data including center, iris position, dimensions, and EAR
+            dict: Eye data including center, iris position, dimensions, EAR and gaze ratios
         """
-        # Get eye landmark coordinates (already in pixel coordinates from FaceDetector)
-        eye_points = []
-        for idx in eye_indices:
-            if idx < len(landmarks):
-                point = landmarks[idx]
-                x = point['x']
-                y = point['y']
-                eye_points.append([x, y])
-        
-        eye_points = np.array(eye_points)
-        
-        # Calculate eye center and dimensions
-        eye_center = eye_points.mean(axis=0).astype(int)
-        eye_left = eye_points[:, 0].min()
-        eye_right = eye_points[:, 0].max()
-        eye_top = eye_points[:, 1].min()
-        eye_bottom = eye_points[:, 1].max()
-        
-        eye_width = eye_right - eye_left
-        eye_height = eye_bottom - eye_top
-        
-        # Calculate Eye Aspect Ratio for blink detection
-        ear = self._get_eye_aspect_ratio(eye_points)
-        
-        # Get iris center (landmarks 468-477 are iris points)
-        iris_points = []
-        for idx in iris_indices:
-            if idx < len(landmarks):
-                point = landmarks[idx]
-                x = point['x']
-                y = point['y']
-                iris_points.append([x, y])
-        
-        iris_center = np.array(iris_points).mean(axis=0).astype(int)
+        (ear, h_ratio, v_ratio, eye_cx, eye_cy, iris_cx, iris_cy,
+         eye_left, eye_top, eye_right, eye_bottom) = compute_ear_and_gaze(landmarks_xy, eye_indices, iris_indices)
+        
+        eye_left, eye_top, eye_right, eye_bottom = int(eye_left), int(eye_top), int(eye_right), int(eye_bottom)
         
         return {
             'eye_name': eye_name,
-            'eye_center': eye_center,
-            'iris_center': iris_center,
-            'eye_width': eye_width,
-            'eye_height': eye_height,
-            'eye_points': eye_points,
-            'iris_points': iris_points,
+            'eye_center': np.array([eye_cx, eye_cy]),
+            'iris_center': np.array([iris_cx, iris_cy]),
+            'eye_width': eye_right - eye_left,
+            'eye_height': eye_bottom - eye_top,
+            'eye_points': landmarks_xy[eye_indices].astype(int),
+            'iris_points': landmarks_xy[iris_indices].astype(int).tolist(),
             'ear': ear,
+            'horizontal_ratio': h_ratio,
+            'vertical_ratio': v_ratio,
             'bbox': (eye_left, eye_top, eye_right, eye_bottom)
         }
     
+    def _fill_landmarks(self, landmarks):
+        """
+        Gather the eye and iris landmark coordinates into the preallocated buffer
+        
+        Args:
+            landmarks: List of landmark dicts from FaceDetector with format {'x': int, 'y': int, 'z': float}
+        """
+        self._lm[:] = [(landmarks[i]['x'], landmarks[i]['y']) for i in EYE_LANDMARKS]
+    
     def detect(self, frame, face_meshes):
         """
         Detect eyes and analyze gaze direction from pre-detected face meshes
@@ -296,34 +349,22 @@ class EyeMovementDetector(BaseDetector):
                 }]
             return []
         
-        h, w, _ = frame.shape
         all_detections = []
         
         # Process each face mesh
         for face_data in face_meshes:
             landmarks = face_data.get('landmarks')
             
-            if not landmarks or len(landmarks) < 478:
+            if not landmarks or len(landmarks) < NUM_LANDMARKS:
                 self.logger.debug("Face mesh missing landmarks (need at least 478 points for iris tracking)")
                 continue
             
             try:
-                # Process both eyes
-                left_eye_data = self._process_eye(
-                    landmarks, 
-                    LEFT_EYE, 
-                    LEFT_IRIS, 
-                    w, h,
-                    'Left'
-                )
+                self._fill_landmarks(landmarks)
                 
-                right_eye_data = self._process_eye(
-                    landmarks, 
-                    RIGHT_EYE, 
-                    RIGHT_IRIS, 
-                    w, h,
-                    'Right'
-                )
+                # Process both eyes
+                left_eye_data = self._process_eye(self._lm, LEFT_EYE_IDX, LEFT_IRIS_IDX, 'Left')
+                right_eye_data = self._process_eye(self._lm, RIGHT_EYE_IDX, RIGHT_IRIS_IDX, 'Right')
                 
                 # Analyze each eye
                 for eye_data in [left_eye_data, right_eye_data]:
@@ -337,10 +378,8 @@ class EyeMovementDetector(BaseDetector):
                     else:
                         # Determine gaze direction
                         status, is_risky, h_ratio, v_ratio = self._get_gaze_direction(
-                            eye_data['eye_center'],
-                            eye_data['iris_center'],
-                            eye_data['eye_width'],
-                            eye_data['eye_height']
+                            eye_data['horizontal_ratio'],
+                            eye_data['vertical_ratio']
                         )
                         
                         eye_data['status'] = status
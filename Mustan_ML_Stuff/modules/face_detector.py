@@ -18,6 +18,20 @@ except ImportError:
     MEDIAPIPE_AVAILABLE = False
     logging.warning("MediaPipe not available. Install with: pip install mediapipe")
 
+# Forehead, chin, right cheek, left cheek - bound the face crop used by FaceMatcher
+FACE_BOX_LANDMARKS = [10, 152, 234, 454]
+
+# Draw every Nth landmark index when landmark numbers are enabled
+LANDMARK_NUMBER_STEP = 10
+
+# Pixel offsets of the plus-shaped dot drawn at each landmark
+_DOT_DX = np.array([0, -1, 1, 0, 0], dtype=np.int32)
+_DOT_DY = np.array([0, 0, 0, -1, 1], dtype=np.int32)
+
+# Per-landmark colours (BGR): face mesh in yellow, iris points (468-477) in magenta
+_LANDMARK_COLORS = np.full((478, 3), (0, 255, 255), dtype=np.uint8)
+_LANDMARK_COLORS[468:] = (255, 0, 255)
+
 
 class FaceDetector(BaseDetector):
     """
@@ -32,7 +46,9 @@ class FaceDetector(BaseDetector):
         enabled=True,
         model_selection=1,  # Legacy parameter, kept for compatibility
         min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
+        min_tracking_confidence=0.5,
+        input_width=640,
+        use_opencl=False
     ):
         """
         Initialize MediaPipe Tasks Vision face landmarker
@@ -43,6 +59,8 @@ class FaceDetector(BaseDetector):
             model_selection: Legacy parameter (not used in Tasks Vision API)
             min_detection_confidence: Minimum confidence for detection (0.0-1.0)
             min_tracking_confidence: Minimum confidence for tracking (0.0-1.0)
+            input_width: Width frames are downscaled to before inference (0 = full resolution)
+            use_opencl: Run preprocessing on a cv2.UMat (OpenCL) when OpenCV has OpenCL enabled
         """
         super().__init__(name, enabled)
         
@@ -52,6 +70,8 @@ class FaceDetector(BaseDetector):
         self.model_selection = model_selection
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
+        self.input_width = input_width
+        self.use_opencl = use_opencl
         
         # MediaPipe Tasks Vision face landmarker
         self.face_landmarker = None
@@ -120,10 +140,22 @@ class FaceDetector(BaseDetector):
             return []
         
         try:
-            # Convert BGR to RGB for MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             h, w = frame.shape[:2]
             
+            # Run preprocessing through the T-API (OpenCL) only when explicitly requested
+            src_frame = cv2.UMat(frame) if self.use_opencl and cv2.ocl.useOpenCL() else frame
+            
+            # Downscale before inference; landmarks are normalized so they map back to full resolution
+            small_frame = src_frame
+            if self.input_width and w > self.input_width:
+                small_h = int(h * self.input_width / w)
+                small_frame = cv2.resize(src_frame, (self.input_width, small_h), interpolation=cv2.INTER_AREA)
+            
+            # Convert BGR to RGB for MediaPipe
+            rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+            if isinstance(rgb_frame, cv2.UMat):
+                rgb_frame = rgb_frame.get()
+            
             # Create MediaPipe Image
             mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
             
@@ -178,6 +210,7 @@ class FaceDetector(BaseDetector):
                             'w': x_max - x_min,
                             'h': y_max - y_min
                         },
+                        'face_box': self._get_face_box(landmarks, w, h),
                         'confidence': 1.0,  # Face Landmarker doesn't provide per-face confidence
                         'landmarks': landmarks
                     }
@@ -190,6 +223,45 @@ class FaceDetector(BaseDetector):
             self.logger.error(f"Error detecting faces: {e}")
             return []
     
+    def _get_face_box(self, landmarks, img_w, img_h):
+        """
+        Compute a square face crop box from forehead/chin/cheek landmarks
+        
+        The crop is what FaceMatcher embeds, so DeepFace does not need to
+        run its own face detector on the frame.
+        
+        Args:
+            landmarks: List of landmark dicts in pixel coordinates
+            img_w: Image width
+            img_h: Image height
+            
+        Returns:
+            dict or None: Box with keys x, y, w, h, or None if it lies outside the image
+        """
+        xs = [landmarks[i]['x'] for i in FACE_BOX_LANDMARKS]
+        ys = [landmarks[i]['y'] for i in FACE_BOX_LANDMARKS]
+        
+        # Square box centred on the face, sized by its larger extent
+        cx = (min(xs) + max(xs)) // 2
+        cy = (min(ys) + max(ys)) // 2
+        half = max(max(xs) - min(xs), max(ys) - min(ys)) // 2
+        
+        # Clamp every edge to the image; landmarks can fall outside the frame
+        x_min = min(max(0, cx - half), img_w)
+        y_min = min(max(0, cy - half), img_h)
+        x_max = min(max(0, cx + half), img_w)
+        y_max = min(max(0, cy + half), img_h)
+        
+        if x_max <= x_min or y_max <= y_min:
+            return None
+        
+        return {
+            'x': x_min,
+            'y': y_min,
+            'w': x_max - x_min,
+            'h': y_max - y_min
+        }
+    
     def draw_faces(self, frame, face_meshes, color=(0, 255, 0), thickness=2, show_all_landmarks=False, show_landmark_numbers=False):
         """
         Draw bounding boxes and landmarks on detected faces
@@ -230,20 +302,7 @@ class FaceDetector(BaseDetector):
             # Draw landmarks based on mode
             if face_data['landmarks'] and len(face_data['landmarks']) > 0:
                 if show_all_landmarks:
-                    # Draw all 478 face mesh landmarks
-                    for idx, lm in enumerate(face_data['landmarks']):
-                        # Use different colors for different facial regions
-                        if idx < 468:  # Face contour and features
-                            point_color = (0, 255, 255)  # Yellow
-                        else:  # Iris landmarks (468-477)
-                            point_color = (255, 0, 255)  # Magenta for iris points
-                        
-                        cv2.circle(output_frame, (lm['x'], lm['y']), 1, point_color, -1)
-                        
-                        # Optionally draw landmark numbers (warning: lots of text!)
-                        if show_landmark_numbers and idx % 10 == 0:  # Show every 10th number
-                            cv2.putText(output_frame, str(idx), (lm['x']+2, lm['y']-2),
-                                       cv2.FONT_HERSHEY_PLAIN, 0.3, (255, 255, 255), 1)
+                    self._draw_mesh(output_frame, face_data['landmarks'], show_landmark_numbers)
                 else:
                     # Draw only key points (eyes, nose, mouth) for clarity
                     key_indices = [33, 133, 362, 263, 1, 61, 291]  # Eyes, nose tip, mouth corners
@@ -254,6 +313,34 @@ class FaceDetector(BaseDetector):
         
         return output_frame
     
+    def _draw_mesh(self, frame, landmarks, show_landmark_numbers=False):
+        """
+        Draw all face mesh landmarks in place with one vectorized pixel write
+        
+        Args:
+            frame: Frame to draw on (modified in place)
+            landmarks: List of landmark dicts in pixel coordinates
+            show_landmark_numbers: If True, labels every LANDMARK_NUMBER_STEP-th landmark
+        """
+        pts = np.array([(lm['x'], lm['y']) for lm in landmarks], dtype=np.int32)
+        num_points = min(len(pts), len(_LANDMARK_COLORS))
+        pts = pts[:num_points]
+        
+        # Expand every landmark into a small dot and write all pixels at once
+        img_h, img_w = frame.shape[:2]
+        xs = (pts[:, 0, None] + _DOT_DX).ravel()
+        ys = (pts[:, 1, None] + _DOT_DY).ravel()
+        colors = np.repeat(_LANDMARK_COLORS[:num_points], len(_DOT_DX), axis=0)
+        inside = (xs >= 0) & (xs < img_w) & (ys >= 0) & (ys < img_h)
+        frame[ys[inside], xs[inside]] = colors[inside]
+        
+        # Optionally draw a decimated subset of landmark numbers
+        if show_landmark_numbers:
+            for idx in range(0, num_points, LANDMARK_NUMBER_STEP):
+                x, y = pts[idx]
+                cv2.putText(frame, str(idx), (int(x) + 2, int(y) - 2),
+                           cv2.FONT_HERSHEY_PLAIN, 0.3, (255, 255, 255), 1)
+    
     def process_frame(self, frame, draw=True, show_all_landmarks=False, show_landmark_numbers=False):
         """
         Process frame: detect faces
@@ -5,6 +5,8 @@ Optimized to accept pre-cropped faces to skip redundant detection
 """
 
 import logging
+import time
+from collections import deque
 import cv2
 import numpy as np
 from pathlib import Path
@@ -33,7 +35,10 @@ class FaceMatcher(BaseDetector):
         model_name='Facenet512',  # DeepFace model: VGG-Face, Facenet, Facenet512, OpenFace, DeepFace, ArcFace, Dlib, SFace
         distance_metric='cosine',  # Distance metric: cosine, euclidean, euclidean_l2
         distance_threshold=0.4,  # Distance threshold for matching (lower = stricter, varies by model)
-        participant_image_path='data/participant.png'
+        participant_image_path='data/participant.png',
+        quantize_embeddings=True,  # Compare cosine distance on int8-quantized embeddings
+        batch_size=1,  # Face crops embedded per forward pass (1 = no batching)
+        batch_timeout=0.1  # Max seconds a queued crop waits for its batch
     ):
         """
         Initialize DeepFace face matcher with configurable backend
@@ -45,6 +50,9 @@ class FaceMatcher(BaseDetector):
             distance_metric: Distance metric for comparison (cosine, euclidean, euclidean_l2)
             distance_threshold: Distance threshold for matching (model-specific, lower = stricter)
             participant_image_path: Path to participant reference image
+            quantize_embeddings: Use int8 embeddings for cosine comparison (ignored for euclidean metrics)
+            batch_size: Number of queued face crops embedded together by submit()
+            batch_timeout: Seconds after which a partial batch is run anyway
             
         Note:
             Recommended thresholds by model (cosine distance):
@@ -65,13 +73,31 @@ class FaceMatcher(BaseDetector):
         self.distance_metric = distance_metric
         self.distance_threshold = distance_threshold
         self.participant_image_path = participant_image_path
+        self.quantize_embeddings = quantize_embeddings and distance_metric == 'cosine'
         
         # Cached participant embedding (computed once, reused for all frames)
         self.participant_embedding = None
         
+        # Cached int8 participant embedding (widened to int32 for the dot product) and its norm
+        self.participant_embedding_q = None
+        self.participant_norm_q = None
+        
         # Cached embedding dimensions
         self.embedding_dim = None
         
+        # Cached once so per-frame debug logging costs a single boolean check
+        self._log_debug = self.logger.isEnabledFor(logging.DEBUG)
+        
+        # Pending face crops for batched embedding (see submit())
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self._pending = deque(maxlen=self.batch_size)
+        self._pending_since = 0.0
+        
+        # DeepFace recognition model, built lazily for batched forward passes
+        self._recognizer = None
+        self._batch_fallback_warned = False  # Per-crop fallback is logged once
+        
         self.logger.info(f"Initializing DeepFace matcher with model={model_name}, metric={distance_metric}, threshold={distance_threshold}")
     
     def load_model(self):
@@ -138,6 +164,11 @@ class FaceMatcher(BaseDetector):
             
             if self.participant_embedding is not None:
                 self.logger.info(f"Participant embedding cached: shape={self.participant_embedding.shape}")
+                
+                if self.quantize_embeddings:
+                    self.participant_embedding_q = self._quantize_embedding(self.participant_embedding).astype(np.int32)
+                    self.participant_norm_q = float(np.sqrt(np.dot(self.participant_embedding_q, self.participant_embedding_q)))
+                    self.logger.info("Participant embedding quantized to int8")
             else:
                 self.logger.error("Failed to extract participant embedding - ensure participant.png contains a clear face")
                 
@@ -218,7 +249,7 @@ class FaceMatcher(BaseDetector):
                 model_name=self.model_name,
                 enforce_detection=False,  # Skip detection, face is already cropped
                 detector_backend='skip',  # Skip detection backend entirely
-                align=True,  # Still align the face for better accuracy
+                align=False,  # Nothing to align against without a detector
                 normalization='base'  # Apply normalization
             )
             
@@ -237,9 +268,44 @@ class FaceMatcher(BaseDetector):
             return embedding
             
         except Exception as e:
-            self.logger.error(f"Error extracting embedding: {e}")
+            self.logger.error("Error extracting embedding: %s", e)
             return None
     
+    def _extract_embeddings_batch(self, face_rois):
+        """
+        Extract embeddings for several pre-cropped faces in one forward pass
+        
+        Mirrors DeepFace.represent() preprocessing with detector_backend='skip'
+        but calls the underlying Keras model once for the whole batch. Falls back
+        to per-crop extraction if the model cannot be called directly.
+        
+        Args:
+            face_rois: List of pre-cropped face regions (numpy arrays BGR)
+            
+        Returns:
+            list: Embedding vectors (None for crops that failed)
+        """
+        try:
+            from deepface.modules import preprocessing
+            
+            if self._recognizer is None:
+                self._recognizer = DeepFace.build_model(model_name=self.model_name)
+            
+            target_size = self._recognizer.input_shape
+            batch = np.concatenate([
+                preprocessing.resize_image(img=face_roi, target_size=(target_size[1], target_size[0]))
+                for face_roi in face_rois
+            ])
+            embeddings = self._recognizer.model.predict(batch, verbose=0)
+            
+            return [np.asarray(embedding) for embedding in embeddings]
+            
+        except Exception as e:
+            if not self._batch_fallback_warned:
+                self._batch_fallback_warned = True
+                self.logger.warning("Batched embedding unavailable, extracting per crop: %s", e)
+            return [self._extract_embedding(face_roi) for face_roi in face_rois]
+    
     def _compute_distance(self, embedding1, embedding2):
         """
         Compute distance between two embeddings based on configured metric
@@ -274,6 +340,61 @@ class FaceMatcher(BaseDetector):
         
         return float(distance)
     
+    def crop_face(self, frame, face_data):
+        """
+        Crop the face region for matching from FaceDetector output
+        
+        Uses the landmark-derived 'face_box' when available, falling back to 'bbox'
+        
+        Args:
+            frame: Full input frame
+            face_data: Face mesh data from FaceDetector
+            
+        Returns:
+            numpy array: Face region (view into frame)
+        """
+        box = face_data.get('face_box') or face_data['bbox']
+        x, y, w, h = box['x'], box['y'], box['w'], box['h']
+        return frame[y:y+h, x:x+w]
+    
+    def _quantize_embedding(self, embedding):
+        """
+        Symmetric int8 quantization with a per-vector scale
+        
+        The scale cancels out in cosine similarity, so no threshold rescaling is needed
+        
+        Args:
+            embedding: Float embedding vector
+            
+        Returns:
+            numpy array: int8 embedding
+        """
+        max_abs = np.max(np.abs(embedding))
+        if max_abs == 0:
+            return np.zeros(len(embedding), dtype=np.int8)
+        return np.round(embedding * (127.0 / max_abs)).astype(np.int8)
+    
+    def _distance_to_participant(self, embedding):
+        """
+        Compute distance from an embedding to the cached participant embedding
+        
+        Uses the int8 cosine path when quantization is enabled
+        
+        Args:
+            embedding: Current face embedding
+            
+        Returns:
+            float: Distance score (lower = more similar)
+        """
+        if self.participant_embedding_q is None:
+            return self._compute_distance(embedding, self.participant_embedding)
+        
+        current_q = self._quantize_embedding(embedding).astype(np.int32)
+        dot = float(np.dot(current_q, self.participant_embedding_q))
+        norm = float(np.sqrt(np.dot(current_q, current_q)))
+        
+        return 1.0 - dot / (norm * self.participant_norm_q + 1e-6)
+    
     def match(self, face_roi):
         """
         Match face against cached participant embedding
@@ -300,17 +421,18 @@ class FaceMatcher(BaseDetector):
                 return False
             
             # Compute distance (lower = more similar)
-            distance = self._compute_distance(current_embedding, self.participant_embedding)
+            distance = self._distance_to_participant(current_embedding)
             
             # Check if match (distance below threshold)
             is_match = distance < self.distance_threshold
             
-            self.logger.debug(f"Match: {is_match}, Distance: {distance:.4f}, Threshold: {self.distance_threshold}")
+            if self._log_debug:
+                self.logger.debug("Match: %s, Distance: %.4f, Threshold: %s", is_match, distance, self.distance_threshold)
             
             return is_match
             
         except Exception as e:
-            self.logger.error(f"Error matching face: {e}")
+            self.logger.error("Error matching face: %s", e)
             return False
     
     def match_with_details(self, face_roi):
@@ -346,27 +468,124 @@ class FaceMatcher(BaseDetector):
                 }
             
             # Compute distance (lower = more similar)
-            distance = self._compute_distance(current_embedding, self.participant_embedding)
+            distance = self._distance_to_participant(current_embedding)
             
-            # Compute confidence (inverse of distance, normalized by threshold)
-            # Confidence is higher when distance is lower
-            confidence = max(0.0, min(1.0, 1.0 - (distance / self.distance_threshold)))
+            return self._build_match_result(distance)
             
-            # Check if match (distance below threshold)
-            is_match = distance < self.distance_threshold
+        except Exception as e:
+            self.logger.error("Error matching face: %s", e)
+            return {
+                "matched": False,
+                "error": str(e)
+            }
+    
+    def _build_match_result(self, distance):
+        """
+        Build detailed match result from a distance score
+        
+        Args:
+            distance: Distance to participant embedding (lower = more similar)
             
+        Returns:
+            dict: Match results with distance and confidence
+        """
+        # Compute confidence (inverse of distance, normalized by threshold)
+        # Confidence is higher when distance is lower
+        confidence = max(0.0, min(1.0, 1.0 - (distance / self.distance_threshold)))
+        
+        # Check if match (distance below threshold)
+        is_match = distance < self.distance_threshold
+        
+        return {
+            "matched": is_match,
+            "distance": float(distance),
+            "confidence": float(confidence),
+            "threshold": self.distance_threshold,
+            "metric": self.distance_metric,
+            "model": self.model_name,
+            "message": "Match found" if is_match else "No match"
+        }
+    
+    def submit(self, face_roi):
+        """
+        Queue a face crop for batched matching
+        
+        The queue is embedded in a single forward pass once it holds batch_size
+        crops or the oldest crop has waited batch_timeout seconds.
+        
+        Args:
+            face_roi: Pre-cropped face region to match (numpy array BGR)
+            
+        Returns:
+            dict or None: Match result for the batch (worst distance), or None while pending
+        """
+        if face_roi is None or face_roi.shape[0] < 10 or face_roi.shape[1] < 10:
+            return None
+        
+        if not self._pending:
+            self._pending_since = time.time()
+        self._pending.append(face_roi)
+        
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return self.flush_if_due()
+    
+    def flush_if_due(self):
+        """
+        Run a partial batch whose oldest crop has waited batch_timeout seconds
+        
+        Call once per processed frame so a partial batch never waits for the
+        next submit() to be matched.
+        
+        Returns:
+            dict or None: Match result for the batch, or None if nothing is due
+        """
+        if self._pending and time.time() - self._pending_since >= self.batch_timeout:
+            return self.flush()
+        return None
+    
+    def clear_pending(self):
+        """Drop queued face crops, e.g. when the face in view may have changed"""
+        self._pending.clear()
+    
+    def flush(self):
+        """
+        Embed all queued face crops in one pass and match them
+        
+        Returns:
+            dict or None: Match result for the batch (worst distance), or None if nothing was queued
+        """
+        if not self._pending:
+            return None
+        
+        if not self.initialized or self.participant_embedding is None:
+            self._pending.clear()
             return {
-                "matched": is_match,
-                "distance": float(distance),
-                "confidence": float(confidence),
-                "threshold": self.distance_threshold,
-                "metric": self.distance_metric,
-                "model": self.model_name,
-                "message": "Match found" if is_match else "No match"
+                "matched": False,
+                "error": "Matcher not initialized"
             }
+        
+        face_rois = list(self._pending)
+        self._pending.clear()
+        
+        try:
+            embeddings = self._extract_embeddings_batch(face_rois)
+            distances = [self._distance_to_participant(e) for e in embeddings if e is not None]
+            
+            if not distances:
+                return {
+                    "matched": False,
+                    "error": "Failed to extract embedding"
+                }
+            
+            # Every crop must match: the worst distance decides the verdict
+            result = self._build_match_result(float(max(distances)))
+            result["batch_size"] = len(distances)
+            result["distances"] = [float(d) for d in distances]
+            return result
             
         except Exception as e:
-            self.logger.error(f"Error matching face: {e}")
+            self.logger.error("Error matching face batch: %s", e)
             return {
                 "matched": False,
                 "error": str(e)
@@ -389,15 +608,12 @@ class FaceMatcher(BaseDetector):
         match_results = []
         
         for face_data in face_meshes:
-            bbox = face_data['bbox']
-            x, y, w, h = bbox['x'], bbox['y'], bbox['w'], bbox['h']
-            
             # Extract face ROI
-            face_roi = frame[y:y+h, x:x+w]
+            face_roi = self.crop_face(frame, face_data)
             
             # Match face
             match_result = self.match_with_details(face_roi)
-            match_result['bbox'] = bbox
+            match_result['bbox'] = face_data['bbox']
             
             match_results.append(match_result)
         
@@ -416,8 +632,12 @@ class FaceMatcher(BaseDetector):
             print(f"[DEBUG] {self.name} Step 0: Clearing embeddings")
             # Clear cached embeddings
             self.participant_embedding = None
+            self.participant_embedding_q = None
+            self.participant_norm_q = None
             print(f"[DEBUG] {self.name} Step 1: participant_embedding = None")
             self.embedding_dim = None
+            self._pending.clear()
+            self._recognizer = None
             print(f"[DEBUG] {self.name} Step 2: embedding_dim = None")
             self.initialized = False
             print(f"[DEBUG] {self.name} Step 3: initialized = False")
@@ -0,0 +1,73 @@
+"""
+Motion Gate Module
+Cheap frame-difference check used to skip expensive inference on static scenes
+"""
+
+import time
+import logging
+import cv2
+
+
+class MotionGate:
+    """
+    Compares a tiny grayscale thumbnail of each frame against the thumbnail
+    taken when the gated work last ran. Reports motion when the mean absolute
+    difference exceeds a threshold, or when the gated work is overdue.
+    """
+
+    def __init__(self, threshold=2.0, size=(80, 60), max_interval=2.0):
+        """
+        Initialize motion gate
+
+        Args:
+            threshold: Mean absolute gray-level difference (0-255) that counts as motion
+            size: Thumbnail size (width, height) used for the comparison
+            max_interval: Seconds after which the gate opens even without motion (0 = never)
+        """
+        self.threshold = threshold
+        self.size = size
+        self.max_interval = max_interval
+
+        # Reference thumbnail and time from the last time the gate opened
+        self._prev_small = None
+        self._last_open_time = 0.0
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.info(f"Motion gate initialized: threshold={threshold}, size={size}, max_interval={max_interval}s")
+
+    def check(self, frame):
+        """
+        Check whether the frame moved enough to re-run the gated work
+
+        The reference thumbnail is only replaced when the gate opens, so slow
+        drift accumulates until it crosses the threshold.
+
+        Args:
+            frame: Input frame (BGR)
+
+        Returns:
+            bool: True if the gated work should run for this frame
+        """
+        small = cv2.cvtColor(
+            cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        )
+        now = time.time()
+
+        if self._prev_small is None:
+            moved = True
+        elif self.max_interval and now - self._last_open_time >= self.max_interval:
+            moved = True
+        else:
+            mean_diff = cv2.norm(self._prev_small, small, cv2.NORM_L1) / small.size
+            moved = mean_diff >= self.threshold
+
+        if moved:
+            self._prev_small = small
+            self._last_open_time = now
+
+        return moved
+
+    def reset(self):
+        """Forget the reference thumbnail so the next check opens the gate"""
+        self._prev_small = None
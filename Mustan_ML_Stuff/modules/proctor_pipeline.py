@@ -17,6 +17,7 @@ from .face_detector import FaceDetector
 from .face_matcher import FaceMatcher
 from .eye_detector import EyeMovementDetector
 from .phone_detector import PhoneDetector
+from .motion_gate import MotionGate
 
 
 class ProctorPipeline(CameraPipeline):
@@ -63,21 +64,19 @@ class ProctorPipeline(CameraPipeline):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.info(f"Proctoring pipeline initialized with frame_skip={frame_skip}")
 
-        # Shared memory buffer for frontend frame streaming
+        # Motion gate: reuse the last face verification while the scene is static
+        self.motion_gate = None
+        self._last_verification = None
+        if getattr(config, 'MOTION_GATE_ENABLE', False):
+            self.motion_gate = MotionGate(
+                threshold=getattr(config, 'MOTION_GATE_THRESHOLD', 2.0),
+                max_interval=getattr(config, 'MOTION_GATE_MAX_INTERVAL', 2.0)
+            )
+
+        # Shared memory buffer for frontend frame streaming (created once the camera
+        # resolution is known, see initialize())
         self.frame_buffer = None
         self._last_preview_state = None  # Track preview state for buffer clearing
-        if config.SHARED_MEMORY_ENABLED:
-            try:
-                # Get absolute path to mmap file
-                script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                mmap_path = os.path.join(script_dir, config.SHARED_MEMORY_PATH)
-                
-                self.logger.info(f"Initializing shared frame buffer at: {mmap_path}")
-                self.frame_buffer = SharedFrameBuffer(file_path=mmap_path, create=True)
-                self.logger.info("Shared frame buffer initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize shared frame buffer: {e}")
-                self.frame_buffer = None
         
         # Proctoring state
         self.proctoring_results = {
@@ -104,7 +103,9 @@ class ProctorPipeline(CameraPipeline):
                     enabled=True,
                     model_selection=getattr(self.config, 'FACE_MODEL_SELECTION', 1),
                     min_detection_confidence=getattr(self.config, 'FACE_MIN_DETECTION_CONFIDENCE', 0.7),
-                    min_tracking_confidence=getattr(self.config, 'FACE_MIN_TRACKING_CONFIDENCE', 0.5)
+                    min_tracking_confidence=getattr(self.config, 'FACE_MIN_TRACKING_CONFIDENCE', 0.5),
+                    input_width=getattr(self.config, 'FACE_DETECT_INPUT_WIDTH', 640),
+                    use_opencl=getattr(self.config, 'USE_OPENCL', False)
                 )
                 
                 if self.face_detector.load_model(getattr(self.config, 'FACE_MARKER_MODEL_PATH', None)):
@@ -128,7 +129,10 @@ class ProctorPipeline(CameraPipeline):
                     model_name=getattr(self.config, 'FACE_MATCHING_BACKEND', 'Facenet'),
                     distance_metric=getattr(self.config, 'FACE_MATCHING_DISTANCE_METRIC', 'cosine'),
                     distance_threshold=getattr(self.config, 'FACE_MATCHING_THRESHOLD', 0.5),
-                    participant_image_path=getattr(self.config, 'PARTICIPANT_DATA_PATH', 'data/participant.png')
+                    participant_image_path=getattr(self.config, 'PARTICIPANT_DATA_PATH', 'data/participant.png'),
+                    quantize_embeddings=getattr(self.config, 'FACE_MATCHING_QUANTIZE', True),
+                    batch_size=getattr(self.config, 'FACE_MATCHING_BATCH_SIZE', 1),
+                    batch_timeout=getattr(self.config, 'FACE_MATCHING_BATCH_TIMEOUT', 0.1)
                 )
                 
                 if self.face_matcher.load_model():
@@ -200,11 +204,44 @@ class ProctorPipeline(CameraPipeline):
         
     
     def initialize(self):
-        """Override to update WebSocket status after camera init"""
+        """Override to create the shared frame buffer after camera init"""
         result = super().initialize()
         
+        if result and self.config.SHARED_MEMORY_ENABLED:
+            self._initialize_frame_buffer()
+        
         return result
     
+    def _initialize_frame_buffer(self):
+        """Create shared memory buffer sized for the negotiated camera resolution"""
+        try:
+            # Get absolute path to mmap file. When spawned by Electron the final path
+            # is passed in PROCTOR_FRAME_SHARED_PATH so both sides agree on it
+            mmap_path = os.environ.get('PROCTOR_FRAME_SHARED_PATH')
+            use_shm = getattr(self.config, 'SHARED_MEMORY_USE_SHM', False)
+            if mmap_path:
+                use_shm = False
+            else:
+                script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                mmap_path = os.path.join(script_dir, self.config.SHARED_MEMORY_PATH)
+            
+            # Size the data region for one raw BGR frame at the actual resolution
+            props = self.camera.get_properties()
+            max_frame_size = props['width'] * props['height'] * 3 if props else None
+            
+            self.logger.info(f"Initializing shared frame buffer at: {mmap_path}")
+            self.frame_buffer = SharedFrameBuffer(
+                file_path=mmap_path,
+                create=True,
+                frame_format=getattr(self.config, 'SHARED_MEMORY_FRAME_FORMAT', 'jpeg'),
+                use_shm=use_shm,
+                max_frame_size=max_frame_size
+            )
+            self.logger.info(f"Shared frame buffer initialized successfully: {self.frame_buffer.file_path}")
+        except Exception as e:
+            self.logger.error(f"Failed to initialize shared frame buffer: {e}")
+            self.frame_buffer = None
+    
     def list_detectors(self):
         """
         List all registered detectors
@@ -322,6 +359,12 @@ class ProctorPipeline(CameraPipeline):
         verification_result = None
         eye_result = None
         
+        # A cached verdict (and any queued crops) only holds while the same single face stays in view
+        if num_faces != 1:
+            self._last_verification = None
+            if self.face_matcher:
+                self.face_matcher.clear_pending()
+        
         # STEP 2: Multiple faces alert
         if num_faces > 1:
             # Multiple faces detected - LOG ALERT & UPDATE ALERT STATE
@@ -367,10 +410,17 @@ class ProctorPipeline(CameraPipeline):
             self.alert_comm.set_no_face(False)
             self.alert_comm.set_multiple_faces(False)
             
-            # STEP 3: If single face then verify
+            # STEP 3: If single face then verify (reuse last verdict if nothing moved)
             if self.face_matcher and self.face_matcher.enabled:
                 try:
-                    verification_result = self._verify_face_sequential(frame, face_meshes[0])
+                    moved = self.motion_gate.check(frame) if self.motion_gate else True
+                    if moved or self._last_verification is None:
+                        verification_result = self._verify_face_sequential(frame, face_meshes[0])
+                    else:
+                        # Still run a partial batch once its timeout expires
+                        result = self.face_matcher.flush_if_due()
+                        verification_result = self._record_verification(result) if result else self._last_verification
+                    self._last_verification = verification_result
                 except Exception as e:
                     self.logger.error(f"Error during face verification: {e}")
             
@@ -484,15 +534,33 @@ class ProctorPipeline(CameraPipeline):
             dict: Verification result
         """
         try:
-            bbox = face_data['bbox']
-            x, y, w, h = bbox['x'], bbox['y'], bbox['w'], bbox['h']
+            # Extract face ROI from the landmarks FaceDetector already computed
+            face_roi = self.face_matcher.crop_face(frame, face_data)
             
-            # Extract face ROI
-            face_roi = frame[y:y+h, x:x+w]
+            # Match face (batched matchers return None until their batch runs)
+            if self.face_matcher.batch_size > 1:
+                result = self.face_matcher.submit(face_roi)
+                if result is None:
+                    return self._last_verification
+            else:
+                result = self.face_matcher.match_with_details(face_roi)
             
-            # Match face
-            result = self.face_matcher.match_with_details(face_roi)
+            return self._record_verification(result)
+        except Exception as e:
+            self.logger.error(f"Error in face verification: {e}")
+            return {'matched': False, 'error': str(e)}
+    
+    def _record_verification(self, result):
+        """
+        Log a verification result and update the face mismatch alert
+        
+        Args:
+            result: Match result from FaceMatcher
             
+        Returns:
+            dict: The same verification result
+        """
+        try:
             # Log result and update alert communicator if verification failed
             if not result.get('matched'):
                 self.session_logger.log_alert(
@@ -1,15 +1,37 @@
 """
 Shared Frame Buffer using Memory-Mapped File
 Allows zero-copy frame sharing between Python and Node.js/Electron
+On Linux the mapping can live in /dev/shm (POSIX shared memory, no disk I/O)
 """
 
 import mmap
 import struct
 import logging
 import cv2
+import numpy as np
 import time
 import os
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+
+# Frame header layout: width, height, channels, timestamp_sec, timestamp_usec, frame_size
+_HEADER = struct.Struct('<6I')
+
+# Same layout as a numpy structured dtype, for reading the header through a view
+HDR_DTYPE = np.dtype([
+    ('width', '<u4'),
+    ('height', '<u4'),
+    ('channels', '<u4'),
+    ('ts_sec', '<u4'),
+    ('ts_usec', '<u4'),
+    ('frame_size', '<u4')
+])
+
 
 class SharedFrameBuffer:
     """
@@ -22,30 +44,62 @@ class SharedFrameBuffer:
     [4 bytes: timestamp_sec]
     [4 bytes: timestamp_usec]
     [4 bytes: frame_size]
-    [remaining: frame_data (raw BGR bytes)]
+    [remaining: frame_data (JPEG bytes or raw BGR bytes)]
+    
+    Raw frames are identified by frame_size == width * height * channels.
     """
     
     HEADER_SIZE = 24  # 6 * 4 bytes
-    MAX_FRAME_SIZE = 1920 * 1080 * 3  # Max HD frame
-    TOTAL_SIZE = HEADER_SIZE + MAX_FRAME_SIZE
+    MAX_FRAME_SIZE = 1920 * 1080 * 3  # Default data region size (Full HD BGR frame)
     
-    def __init__(self, file_path, create=True):
+    FRAME_FORMATS = ('jpeg', 'raw')
+    SHM_DIR = '/dev/shm'  # tmpfs backing POSIX shared memory on Linux
+    
+    def __init__(self, file_path, create=True, frame_format='jpeg', use_shm=False, max_frame_size=None):
         """
         Initialize shared frame buffer
         
         Args:
             file_path: Full path to memory-mapped file
             create: If True, create new buffer; if False, open existing
+            frame_format: 'jpeg' (encoded, for the Electron preview) or 'raw' (BGR bytes, no encode)
+            use_shm: If True and /dev/shm exists, place the buffer there under the
+                     same file name instead of on disk (falls back to file_path)
+            max_frame_size: Data region size in bytes, e.g. width * height * 3 of the
+                            negotiated camera resolution (default: MAX_FRAME_SIZE).
+                            Ignored when opening an existing buffer, which uses its file size.
         """
+        if frame_format not in self.FRAME_FORMATS:
+            raise ValueError(f"Unsupported frame format: {frame_format}")
+        
+        self.use_shm = use_shm and os.path.isdir(self.SHM_DIR)
+        if self.use_shm:
+            file_path = os.path.join(self.SHM_DIR, os.path.basename(file_path))
+        
         self.file_path = file_path
+        self.create = create
+        self.frame_format = frame_format
+        self.max_frame_size = max_frame_size or self.MAX_FRAME_SIZE
+        self.total_size = self.HEADER_SIZE + self.max_frame_size
         self.logger = logging.getLogger(self.__class__.__name__)
         self.mmap_file = None
         self.file_handle = None
+        self._view = None  # Flat uint8 view over the mmap (zero-copy reads)
+        self._hdr = None  # Structured HDR_DTYPE view over the header
+        
+        # libjpeg-turbo encoder (releases the GIL while encoding); falls back to cv2.imencode
+        self._jpeg = None
+        if frame_format == 'jpeg' and TURBOJPEG_AVAILABLE:
+            try:
+                self._jpeg = TurboJPEG()
+            except Exception as e:
+                self.logger.warning(f"TurboJPEG unavailable, using cv2.imencode: {e}")
         
         # Preview control flag file (separate 4-byte mmap)
         self.flag_path = file_path.replace('.mmap', '_flag.mmap')
         self.flag_mmap = None
         self.flag_handle = None
+        self._flag_view = None  # uint32 view over the flag mmap
         
         if create:
             self._create_buffer()
@@ -64,6 +118,7 @@ class SharedFrameBuffer:
             # Open for reading and writing
             self.flag_handle = open(self.flag_path, 'r+b')
             self.flag_mmap = mmap.mmap(self.flag_handle.fileno(), 4)
+            self._flag_view = np.frombuffer(self.flag_mmap, dtype=np.uint32)
             
             self.logger.info(f"Preview flag file created: {self.flag_path}")
         except Exception as e:
@@ -75,6 +130,7 @@ class SharedFrameBuffer:
         try:
             self.flag_handle = open(self.flag_path, 'r+b')
             self.flag_mmap = mmap.mmap(self.flag_handle.fileno(), 4)
+            self._flag_view = np.frombuffer(self.flag_mmap, dtype=np.uint32)
             # Ensure flag is set to enabled by default on open
             self.enable_preview()
             self.logger.info(f"Preview flag file opened: {self.flag_path}")
@@ -85,26 +141,26 @@ class SharedFrameBuffer:
     def _create_buffer(self):
         """Create new shared memory buffer"""
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            if not self.use_shm:
+                # Ensure directory exists
+                os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
             
-            # Create file with required size
-            with open(self.file_path, 'wb') as f:
-                f.write(b'\x00' * self.TOTAL_SIZE)
+            # Size the file with truncate (zero-filled lazily) instead of writing zeros
+            self.file_handle = open(self.file_path, 'w+b')
+            self.file_handle.truncate(self.total_size)
             
-            # Open for reading and writing
-            self.file_handle = open(self.file_path, 'r+b')
             self.mmap_file = mmap.mmap(
                 self.file_handle.fileno(),
-                self.TOTAL_SIZE,
+                self.total_size,
                 access=mmap.ACCESS_WRITE
             )
             
             # Initialize header with zeros
-            self.mmap_file.seek(0)
-            self.mmap_file.write(struct.pack('6I', 0, 0, 0, 0, 0, 0))
+            _HEADER.pack_into(self.mmap_file, 0, 0, 0, 0, 0, 0, 0)
+            self._view = np.frombuffer(self.mmap_file, dtype=np.uint8)
+            self._hdr = np.frombuffer(self.mmap_file, dtype=HDR_DTYPE, count=1)
             
-            self.logger.info(f"Created shared buffer at: {self.file_path}")
+            self.logger.info(f"Created shared buffer at: {self.file_path} ({self.total_size} bytes)")
             
         except Exception as e:
             self.logger.error(f"Failed to create shared buffer: {e}")
@@ -114,11 +170,18 @@ class SharedFrameBuffer:
         """Open existing shared memory buffer"""
         try:
             self.file_handle = open(self.file_path, 'r+b')
+            
+            # Buffer size is whatever the writer negotiated
+            self.total_size = os.fstat(self.file_handle.fileno()).st_size
+            self.max_frame_size = self.total_size - self.HEADER_SIZE
+            
             self.mmap_file = mmap.mmap(
                 self.file_handle.fileno(),
-                self.TOTAL_SIZE,
+                self.total_size,
                 access=mmap.ACCESS_READ
             )
+            self._view = np.frombuffer(self.mmap_file, dtype=np.uint8)
+            self._hdr = np.frombuffer(self.mmap_file, dtype=HDR_DTYPE, count=1)
             self.logger.info(f"Opened shared buffer at: {self.file_path}")
             
         except Exception as e:
@@ -129,30 +192,20 @@ class SharedFrameBuffer:
         """Zero out header to prevent stale frames across sessions"""
         try:
             if self.mmap_file:
-                self.mmap_file.seek(0)
-                self.mmap_file.write(struct.pack('6I', 0, 0, 0, 0, 0, 0))
-                self.mmap_file.flush()
+                _HEADER.pack_into(self.mmap_file, 0, 0, 0, 0, 0, 0, 0)
         except Exception as e:
-            self.logger.error(f"Error resetting buffer header: {e}")
+            self.logger.error("Error resetting buffer header: %s", e)
     
     def is_preview_enabled(self):
-        """Check if preview mode is enabled (read flag from mmap)"""
-        try:
-            if self.flag_mmap:
-                flag_value = struct.unpack('I', self.flag_mmap[0:4])[0]
-                return flag_value == 1
-            return False
-        except Exception as e:
-            self.logger.error(f"Error reading preview flag: {e}")
-            return False
+        """Check if preview mode is enabled (single load from the flag view, called per frame)"""
+        flag_view = self._flag_view
+        return flag_view is not None and bool(flag_view[0] == 1)
     
     def enable_preview(self):
         """Enable preview mode (set flag to 1)"""
         try:
-            if self.flag_mmap:
-                self.flag_mmap.seek(0)
-                self.flag_mmap.write(struct.pack('I', 1))
-                self.flag_mmap.flush()
+            if self._flag_view is not None:
+                self._flag_view[0] = 1
                 self.logger.info("Preview mode enabled")
                 return True
             return False
@@ -163,11 +216,9 @@ class SharedFrameBuffer:
     def disable_preview(self):
         """Disable preview mode (set flag to 0) and clear the buffer"""
         try:
-            if self.flag_mmap:
+            if self._flag_view is not None:
                 # Set flag to disabled
-                self.flag_mmap.seek(0)
-                self.flag_mmap.write(struct.pack('I', 0))
-                self.flag_mmap.flush()
+                self._flag_view[0] = 0
                 
                 # Clear the buffer header to prevent stale frames
                 self._reset_header()
@@ -181,11 +232,11 @@ class SharedFrameBuffer:
     
     def write_frame(self, frame, quality=70):
         """
-        Write frame to shared memory as JPEG
+        Write frame to shared memory (JPEG or raw BGR, per frame_format)
         
         Args:
             frame: OpenCV frame (BGR format)
-            quality: JPEG quality (1-100, default 70)
+            quality: JPEG quality (1-100, default 70), ignored for raw frames
         
         Returns:
             bool: Success status
@@ -196,32 +247,42 @@ class SharedFrameBuffer:
         try:
             height, width, channels = frame.shape
             
-            # Encode frame as JPEG
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
-            success, jpeg_buffer = cv2.imencode('.jpg', frame, encode_param)
-            
-            if not success:
-                self.logger.error("Failed to encode frame as JPEG")
-                return False
-            
-            # Convert to bytes
-            jpeg_bytes = jpeg_buffer.tobytes()
-            frame_size = len(jpeg_bytes)
+            if self.frame_format == 'raw':
+                # Raw BGR bytes are copied straight into the mmap (no encode)
+                if not frame.flags['C_CONTIGUOUS']:
+                    frame = np.ascontiguousarray(frame)
+                payload = frame.data
+                frame_size = frame.nbytes
+            elif self._jpeg is not None:
+                # Encode frame as JPEG with libjpeg-turbo directly
+                payload = self._jpeg.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+                frame_size = len(payload)
+            else:
+                # Encode frame as JPEG
+                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+                success, jpeg_buffer = cv2.imencode('.jpg', frame, encode_param)
+                
+                if not success:
+                    self.logger.error("Failed to encode frame as JPEG")
+                    return False
+                
+                payload = jpeg_buffer.tobytes()
+                frame_size = len(payload)
             
             # Check size limit
-            if frame_size > self.MAX_FRAME_SIZE:
-                self.logger.warning(f"JPEG frame too large: {frame_size} > {self.MAX_FRAME_SIZE}")
+            if frame_size > self.max_frame_size:
+                self.logger.warning("Frame too large: %d > %d", frame_size, self.max_frame_size)
                 return False
             
-            # Get timestamp
-            timestamp = time.time()
-            timestamp_sec = int(timestamp)
-            timestamp_usec = int((timestamp - timestamp_sec) * 1_000_000)
+            # Get timestamp (integer nanoseconds, no float round-trip)
+            timestamp_ns = time.time_ns()
+            timestamp_sec = timestamp_ns // 1_000_000_000
+            timestamp_usec = (timestamp_ns // 1000) % 1_000_000
             
-            # Write header
-            self.mmap_file.seek(0)
-            header = struct.pack(
-                '6I',
+            # Write header directly into the mmap (no intermediate bytes object)
+            _HEADER.pack_into(
+                self.mmap_file,
+                0,
                 width,
                 height,
                 channels,
@@ -229,22 +290,25 @@ class SharedFrameBuffer:
                 timestamp_usec,
                 frame_size
             )
-            self.mmap_file.write(header)
             
-            # Write JPEG data
-            self.mmap_file.write(jpeg_bytes)
-            self.mmap_file.flush()
+            # Write frame data (no flush: the mapping is already visible to other processes)
+            self.mmap_file[self.HEADER_SIZE:self.HEADER_SIZE + frame_size] = payload
             
             return True
             
         except Exception as e:
-            self.logger.error(f"Error writing frame: {e}")
+            self.logger.error("Error writing frame: %s", e)
             return False
     
-    def read_frame(self):
+    def read_frame(self, copy=True):
         """
         Read frame from shared memory
         
+        Args:
+            copy: If False, raw frames are returned as a view over the mmap (no copy).
+                  The view is overwritten by the next write and must be dropped
+                  before close().
+        
         Returns:
             tuple: (frame, timestamp) or (None, None) on error
         """
@@ -253,20 +317,21 @@ class SharedFrameBuffer:
         
         try:
             # Read header
-            self.mmap_file.seek(0)
-            header_data = self.mmap_file.read(self.HEADER_SIZE)
-            width, height, channels, ts_sec, ts_usec, frame_size = struct.unpack('6I', header_data)
+            width, height, channels, ts_sec, ts_usec, frame_size = self._hdr[0].item()
             
             # Check if valid frame
             if width == 0 or height == 0 or frame_size == 0:
                 return None, None
             
-            # Read frame data
-            frame_data = self.mmap_file.read(frame_size)
+            frame_data = self._view[self.HEADER_SIZE:self.HEADER_SIZE + frame_size]
             
-            # Reconstruct frame
-            import numpy as np
-            frame = np.frombuffer(frame_data, dtype=np.uint8).reshape((height, width, channels))
+            # Reconstruct frame (raw BGR or JPEG-encoded)
+            if frame_size == width * height * channels:
+                frame = frame_data.reshape((height, width, channels))
+                if copy:
+                    frame = frame.copy()
+            else:
+                frame = cv2.imdecode(frame_data, cv2.IMREAD_COLOR)
             
             # Reconstruct timestamp
             timestamp = ts_sec + (ts_usec / 1_000_000)
@@ -274,7 +339,7 @@ class SharedFrameBuffer:
             return frame, timestamp
             
         except Exception as e:
-            self.logger.error(f"Error reading frame: {e}")
+            self.logger.error("Error reading frame: %s", e)
             return None, None
     
     def read_frame_info(self):
@@ -288,9 +353,7 @@ class SharedFrameBuffer:
             return None
         
         try:
-            self.mmap_file.seek(0)
-            header_data = self.mmap_file.read(self.HEADER_SIZE)
-            width, height, channels, ts_sec, ts_usec, frame_size = struct.unpack('6I', header_data)
+            width, height, channels, ts_sec, ts_usec, frame_size = self._hdr[0].item()
             
             if width == 0 or height == 0:
                 return None
@@ -304,29 +367,52 @@ class SharedFrameBuffer:
             }
             
         except Exception as e:
-            self.logger.error(f"Error reading frame info: {e}")
+            self.logger.error("Error reading frame info: %s", e)
             return None
     
     def close(self):
         """Close shared memory buffer"""
         try:
             self._reset_header()
+            # Release the numpy views first, mmap cannot close while they are exported
+            self._view = None
+            self._hdr = None
             if self.mmap_file:
-                self.mmap_file.close()
+                self._close_mmap(self.mmap_file)
                 self.mmap_file = None
             if self.file_handle:
                 self.file_handle.close()
                 self.file_handle = None
+            self._flag_view = None
             if self.flag_mmap:
-                self.flag_mmap.close()
+                self._close_mmap(self.flag_mmap)
                 self.flag_mmap = None
             if self.flag_handle:
                 self.flag_handle.close()
                 self.flag_handle = None
+            # /dev/shm files outlive the process, remove them so no reader picks up a stale buffer
+            if self.create and os.path.dirname(self.file_path) == self.SHM_DIR:
+                for path in (self.file_path, self.flag_path):
+                    if os.path.exists(path):
+                        os.remove(path)
             self.logger.info("Closed shared buffer")
         except Exception as e:
             self.logger.error(f"Error closing buffer: {e}")
     
+    def _close_mmap(self, mm):
+        """
+        Close an mmap without aborting the rest of close()
+        
+        Args:
+            mm: mmap object to close
+        """
+        try:
+            mm.close()
+        except BufferError:
+            # A caller still holds a read_frame(copy=False) view; the mapping
+            # is released once that view is garbage collected
+            self.logger.warning("Shared buffer still referenced by a frame view, deferring unmap")
+    
     def cleanup(self):
         """Close and delete buffer file"""
         self.close()
@@ -115,12 +115,15 @@ ipcMain.handle('proctoring:start', async (event, options) => {
     }
 
     // Start monitoring with feature flags from environment
+    const frameSharedPath = resolveFrameSharedPath();
     const result = cameraMonitor.startMonitoring({
       sessionId: options.sessionId,
       faceDetect: process.env.ENABLE_FACE_DETECTION !== 'false' && options.faceDetect,
       faceMatch: process.env.ENABLE_FACE_MATCHING !== 'false' && options.faceMatch,
       eyeTracking: process.env.ENABLE_EYE_TRACKING !== 'false' && options.eyeTracking,
       phoneDetect: process.env.ENABLE_PHONE_DETECTION === 'true' && options.phoneDetect,
+      // Python writes the frame buffer exactly where the frame stream reads it
+      env: frameSharedPath ? { PROCTOR_FRAME_SHARED_PATH: frameSharedPath } : {},
       watchAlerts: true,
       watchLogs: false,
       onOutput: (data, type) => {
@@ -251,29 +254,58 @@ ipcMain.handle('proctoring:getAlertsJSON', async (event, sessionId) => {
 let frameReader = null;
 let frameStreamInterval = null;
 
+/**
+ * Resolve the absolute shared frame buffer path from .env
+ * The same path is passed to the Python process, so both sides always agree
+ * @returns {string|null} Absolute path, or null if FRAME_SHARED_PATH is not set
+ */
+function resolveFrameSharedPath() {
+  const mmapPath = process.env.FRAME_SHARED_PATH;
+  if (!mmapPath) {
+    return null;
+  }
+
+  // On Linux, FRAME_SHARED_USE_SHM places the buffer in /dev/shm (no disk I/O)
+  if (process.platform === 'linux' && process.env.FRAME_SHARED_USE_SHM === 'true') {
+    return path.join('/dev/shm', path.basename(mmapPath));
+  }
+
+  return path.isAbsolute(mmapPath)
+    ? mmapPath
+    : path.join(__dirname, '../..', mmapPath);
+}
+
 ipcMain.handle('proctoring:startFrameStream', async (event, options = {}) => {
   try {
     const fps = options.fps || 30;
     
     // Get shared memory path from environment
-    const mmapPath = process.env.FRAME_SHARED_PATH;
-    if (!mmapPath) {
+    const absolutePath = resolveFrameSharedPath();
+    if (!absolutePath) {
       return {
         success: false,
         error: 'FRAME_SHARED_PATH not configured in .env'
       };
     }
 
-    // Resolve absolute path
-    const absolutePath = path.isAbsolute(mmapPath) 
-      ? mmapPath 
-      : path.join(__dirname, '../..', mmapPath);
-
     console.log(`[FrameStream] Starting stream from: ${absolutePath}`);
 
     // Create frame reader
-    frameReader = new SharedMemoryFrameReader(absolutePath);
-    if (!frameReader.open()) {
+    const reader = new SharedMemoryFrameReader(absolutePath);
+    frameReader = reader;
+    const openTimeout = parseInt(process.env.FRAME_OPEN_TIMEOUT_MS || '30000');
+    const opened = await reader.openWithRetry(openTimeout);
+
+    // The stream may have been stopped or restarted while waiting for the file
+    if (frameReader !== reader) {
+      reader.close();
+      return {
+        success: false,
+        error: 'Frame stream was stopped'
+      };
+    }
+
+    if (!opened) {
       return {
         success: false,
         error: 'Failed to open shared memory file'
@@ -20,8 +20,8 @@ class SharedMemoryFrameReader {
     
     // Frame header constants (must match Python SharedFrameBuffer)
     this.HEADER_SIZE = 24; // 6 * 4 bytes (6 uint32 values)
-    this.MAX_FRAME_SIZE = 1920 * 1080 * 3; // HD frame
-    this.TOTAL_SIZE = this.HEADER_SIZE + this.MAX_FRAME_SIZE;
+    // Python sizes the buffer to the negotiated camera resolution; read from the file on open()
+    this.MAX_FRAME_SIZE = 0;
     
     // Reusable buffer for reading
     this.headerBuffer = Buffer.allocUnsafe(this.HEADER_SIZE);
@@ -44,11 +44,12 @@ class SharedMemoryFrameReader {
       
       // Get file stats
       const stats = fs.fstatSync(this.fd);
-      if (stats.size < this.TOTAL_SIZE) {
-        console.error(`[SharedMemory] File too small: ${stats.size} < ${this.TOTAL_SIZE}`);
+      if (stats.size <= this.HEADER_SIZE) {
+        console.error(`[SharedMemory] File too small: ${stats.size} <= ${this.HEADER_SIZE}`);
         this.close();
         return false;
       }
+      this.MAX_FRAME_SIZE = stats.size - this.HEADER_SIZE;
 
       this.isOpen = true;
       console.log(`[SharedMemory] Opened: ${this.mmapFilePath}`);
@@ -61,6 +62,25 @@ class SharedMemoryFrameReader {
     }
   }
 
+  /**
+   * Open the memory-mapped file, waiting for the Python process to create it
+   * Python creates the buffer only once its detectors and camera are ready
+   * @param {number} timeoutMs - Maximum time to wait
+   * @param {number} intervalMs - Delay between attempts
+   * @returns {Promise<boolean>} Success status
+   */
+  async openWithRetry(timeoutMs = 30000, intervalMs = 250) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      // Only attempt to open once the file exists, to avoid logging every poll
+      if (fs.existsSync(this.mmapFilePath) && this.open()) {
+        return true;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    return this.open();
+  }
+
   /**
    * Read frame header metadata
    * @returns {Object|null} Frame info or null if invalid
@@ -87,6 +107,10 @@ class SharedMemoryFrameReader {
         return null; // No frame written yet
       }
 
+      if (frame_size > this.MAX_FRAME_SIZE) {
+        // The writer may have recreated the buffer at a larger size since open()
+        this.MAX_FRAME_SIZE = fs.fstatSync(this.fd).size - this.HEADER_SIZE;
+      }
       if (frame_size > this.MAX_FRAME_SIZE) {
         console.error(`[SharedMemory] Invalid frame size: ${frame_size}`);
         return null;
@@ -185,7 +185,7 @@ const PreTestCheck = () => {
 
       setAiProcessSpawned(true);
 
-      // Wait for shared memory file to be created
+      // Give the AI process a head start (startFrameStream waits for the shared memory file)
       await new Promise(resolve => setTimeout(resolve, 2000));
 
       // Start frame streaming